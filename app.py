@@ -6,6 +6,7 @@ import requests
 from utils.database import Database
 from utils.simulator import BenchmarkSimulator
 from utils.stripe_handler import StripeHandler
+from utils.recommender import RecommendationEngine
 
 # Page config
 st.set_page_config(
@@ -20,6 +21,23 @@ db = Database()
 simulator = BenchmarkSimulator()
 stripe_handler = StripeHandler()
 
+@st.cache_resource
+def get_recommender():
+    """Pareto frontiers from the catalog and stored results, shared across sessions"""
+    engine = RecommendationEngine(simulator.sample_data)
+    # Raising keeps an unseeded engine out of the cache, the next rerun retries
+    jobs = db.get_completed_jobs(raise_errors=True)
+    # Oldest first, so each model ends up holding its latest measurement
+    for job in reversed(jobs):
+        engine.add_results(job.get("results"))
+    return engine
+
+try:
+    recommender = get_recommender()
+except Exception as e:
+    print(f"Error seeding recommendations: {e}")
+    recommender = RecommendationEngine(simulator.sample_data)
+
 # Custom CSS
 st.markdown("""
 <style>
@@ -58,11 +76,18 @@ def login_section():
     
     if st.sidebar.button("Login / Register", type="primary"):
         if "@" in email and "." in email:
-            # Check if user exists
-            user = db.get_user(email)
+            # Check if user exists, a failed lookup must not look like a new user
+            try:
+                user = db.get_user(email, raise_errors=True)
+            except Exception as e:
+                st.sidebar.error(f"Could not reach the server, please try again ({e})")
+                return
             if not user:
                 # Create new user
                 user = db.create_user(email)
+                if not user:
+                    st.sidebar.error("Could not sign you in, please try again")
+                    return
                 st.sidebar.success(f"Welcome! You get 3 free credits!")
             else:
                 st.sidebar.success(f"Welcome back, {email}!")
@@ -122,6 +147,14 @@ def run_benchmark_tab(user):
             ["quick", "advanced"],
             format_func=lambda x: f"⚡ {x.title()} (Free)" if x == "quick" else f"🚀 {x.title()} (1 Credit)"
         )
+        
+        # Optional deployment constraints for the recommendation
+        max_speed = st.number_input(
+            "Max inference time (ms)", min_value=1.0, value=None, placeholder="No limit"
+        )
+        max_size = st.number_input(
+            "Max model size (MB)", min_value=1.0, value=None, placeholder="No limit"
+        )
     
     with col2:
         st.info("""
@@ -141,16 +174,28 @@ def run_benchmark_tab(user):
             return
         
         # Create job record
-        job_id = db.create_job(
-            user_email=user["email"],
-            job_type=job_type,
-            parameters={"disease": disease}
-        )
+        try:
+            job_id = db.create_job(
+                user_email=user["email"],
+                job_type=job_type,
+                parameters={"disease": disease}
+            )
+        except TimeoutError:
+            st.warning("⏳ We couldn't confirm the job was created. Refresh 'My Results' in a moment before trying again.")
+            return
         
         if job_id:
             # Deduct credit for advanced jobs
             if job_type == "advanced":
-                new_credits = db.update_credits(user["email"], -1)
+                try:
+                    new_credits = db.update_credits(user["email"], -1)
+                except TimeoutError:
+                    # The deduction may still land, so the job is neither run nor failed
+                    st.warning("⏳ We couldn't confirm your credit deduction. Refresh in a moment to check your balance and job status.")
+                    return
+                if new_credits is None:
+                    db.update_job(job_id, "failed")
+                    return
                 st.session_state["user"]["credits"] = new_credits
             
             # Show progress
@@ -166,7 +211,9 @@ def run_benchmark_tab(user):
                 
                 # Get results
                 results = simulator.simulate_benchmark(disease, "quick")
-                db.update_job(job_id, "completed", results)
+                apply_recommendation(results, max_speed, max_size)
+                if not db.update_job(job_id, "completed", results):
+                    st.warning("⚠️ Results could not be saved to your history")
                 
                 progress_bar.empty()
                 status_text.empty()
@@ -186,6 +233,7 @@ def run_benchmark_tab(user):
                     def process_async():
                         time.sleep(8)  # Simulate processing time
                         results = simulator.simulate_benchmark(disease, "advanced")
+                        apply_recommendation(results, max_speed, max_size)
                         db.update_job(job_id, "completed", results)
                     
                     thread = threading.Thread(target=process_async)
@@ -194,6 +242,15 @@ def run_benchmark_tab(user):
                 except Exception as e:
                     st.error(f"Error queueing job: {e}")
 
+def apply_recommendation(results: dict, max_speed: float = None, max_size: float = None):
+    """Fold new results into the frontier and tailor the recommendation to the user's limits"""
+    recommender.add_results(results)
+    if max_speed is not None or max_size is not None:
+        results["recommendation"] = recommender.recommendation_text(
+            results["disease"], max_speed, max_size, current=results["models"]
+        )
+        results["constraints"] = {"max_speed": max_speed, "max_size": max_size}
+
 def show_results(results: dict, job_id: int):
     """Display benchmark results beautifully"""
     st.success("✅ Benchmark completed!")
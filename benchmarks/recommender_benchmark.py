@@ -0,0 +1,70 @@
+"""
+Benchmark the recommendation engine on large synthetic catalogs.
+
+Run from the project root:
+    python -m benchmarks.recommender_benchmark
+"""
+import random
+import time
+
+from utils.recommender import RecommendationEngine
+
+
+def synthetic_models(count: int, tradeoff: bool):
+    """Random models. With tradeoff, accuracy grows with speed and size like real architectures"""
+    models = []
+    for i in range(count):
+        speed = random.uniform(5, 200)
+        size = random.uniform(5, 600)
+        if tradeoff:
+            accuracy = 0.6 + 0.35 * (speed / 200 + size / 600) / 2 + random.gauss(0, 0.03)
+        else:
+            accuracy = random.uniform(0.6, 0.99)
+        models.append({"name": f"model_{i}", "accuracy": accuracy, "speed": speed, "size": size})
+    return models
+
+
+def run(count: int, tradeoff: bool, queries: int = 10000):
+    models = synthetic_models(count, tradeoff)
+    engine = RecommendationEngine()
+
+    start = time.perf_counter()
+    engine.add_models("synthetic", models[: count // 2])
+    build = time.perf_counter() - start
+
+    # The second half arrives one job result at a time
+    start = time.perf_counter()
+    for model in models[count // 2:]:
+        engine.add_results({"disease": "synthetic", "models": [model]})
+    incremental = (time.perf_counter() - start) / (count - count // 2)
+
+    # Existing models get re-measured by later jobs
+    remeasured = random.sample(models, min(1000, count))
+    start = time.perf_counter()
+    for model in remeasured:
+        noisy = dict(model, accuracy=model["accuracy"] + random.uniform(-0.02, 0.02))
+        engine.add_results({"disease": "synthetic", "models": [noisy]})
+    update = (time.perf_counter() - start) / len(remeasured)
+
+    limits = [(random.choice([None, random.uniform(5, 200)]),
+               random.choice([None, random.uniform(5, 600)])) for _ in range(queries)]
+    latencies = []
+    for max_speed, max_size in limits:
+        start = time.perf_counter()
+        engine.recommend("synthetic", max_speed, max_size)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+
+    print(f"{count:>8} models  tradeoff={str(tradeoff):5}  "
+          f"frontier={len(engine.frontier('synthetic')):>5}  "
+          f"build={build * 1000:8.1f}ms  add={incremental * 1e6:7.1f}us  "
+          f"update={update * 1e6:8.1f}us  "
+          f"query p50={latencies[len(latencies) // 2] * 1e6:6.1f}us  "
+          f"p99={latencies[int(len(latencies) * 0.99)] * 1e6:6.1f}us")
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    for count in (1_000, 10_000, 100_000):
+        for tradeoff in (False, True):
+            run(count, tradeoff)
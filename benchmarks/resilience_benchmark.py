@@ -0,0 +1,127 @@
+"""
+Benchmark ResilientCaller against a fake Supabase backend that injects
+latency and errors.
+
+Run from the project root:
+    python -m benchmarks.resilience_benchmark
+"""
+import random
+import time
+
+from utils.resilience import ResilientCaller, CircuitOpenError
+
+
+class FakeBackend:
+    """Answers in 5-15ms, except for a slow tail and a share of errors"""
+
+    def __init__(self, slow_rate: float = 0.03, slow_seconds: float = 0.5,
+                 error_rate: float = 0.02, down: bool = False):
+        self.slow_rate = slow_rate
+        self.slow_seconds = slow_seconds
+        self.error_rate = error_rate
+        self.down = down
+        self.requests = 0
+
+    def query(self):
+        self.requests += 1
+        roll = random.random()
+        if self.down or roll < self.error_rate:
+            time.sleep(0.005)
+            raise ConnectionError("injected backend error")
+        if roll < self.error_rate + self.slow_rate:
+            time.sleep(self.slow_seconds)
+        else:
+            time.sleep(random.uniform(0.005, 0.015))
+        return {"data": [{"email": "user@example.com", "credits": 3}]}
+
+
+def percentile(samples: list, p: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(p * len(samples)))]
+
+
+def measure(name: str, fn, calls: int):
+    latencies = []
+    errors = 0
+    for _ in range(calls):
+        start = time.perf_counter()
+        try:
+            fn()
+        except Exception:
+            errors += 1
+        latencies.append(time.perf_counter() - start)
+    print(f"{name:10} p50={percentile(latencies, 0.5) * 1000:6.1f}ms  "
+          f"p99={percentile(latencies, 0.99) * 1000:6.1f}ms  "
+          f"max={max(latencies) * 1000:6.1f}ms  errors={errors}/{calls}")
+
+
+def tail_latency(calls: int = 600):
+    print(f"Slow tail and errors, {calls} sequential reads")
+    backend = FakeBackend()
+    measure("direct", backend.query, calls)
+
+    backend = FakeBackend()
+    caller = ResilientCaller(timeout=1.0, max_workers=16)
+    measure("resilient", lambda: caller.call(
+        backend.query, op="get_user", idempotent=True, hedge=True, cache_key=("user", "bench")
+    ), calls)
+    print(f"{'':10} backend requests incl. hedges and retries: {backend.requests}")
+
+
+def hung_backend():
+    print("Hung backend, 0.2s deadline")
+    caller = ResilientCaller(timeout=0.2)
+    start = time.perf_counter()
+    try:
+        caller.call(lambda: time.sleep(2), op="hung")
+    except TimeoutError as e:
+        print(f"{'':10} {e} after {(time.perf_counter() - start) * 1000:.0f}ms")
+
+
+def hard_down(calls: int = 8):
+    print("Hard-down backend, breaker opens after 3 failed calls")
+    backend = FakeBackend()
+    caller = ResilientCaller(timeout=0.5, failure_threshold=3, reset_timeout=60)
+    caller.call(backend.query, op="get_user", cache_key=("user", "bench"))
+
+    backend.down = True
+    for i in range(calls):
+        start = time.perf_counter()
+        try:
+            result = caller.call(backend.query, op="get_user", idempotent=True,
+                                 hedge=True, cache_key=("user", "bench"))
+            outcome = "stale" if result else "empty"
+        except ConnectionError:
+            outcome = "error"
+        print(f"{'':10} call {i + 1}: {outcome:5} {(time.perf_counter() - start) * 1000:6.1f}ms  "
+              f"open={caller.is_open}  backend requests={backend.requests}")
+
+    try:
+        caller.call(backend.query, op="create_job")
+    except CircuitOpenError as e:
+        print(f"{'':10} uncached call while open: {e}")
+
+
+def application_errors(calls: int = 10):
+    print(f"Backend rejects {calls} requests (e.g. a bad filter), breaker threshold 3")
+    requests = []
+
+    def rejected():
+        requests.append(1)
+        raise ValueError("invalid input syntax")
+
+    caller = ResilientCaller(failure_threshold=3)
+    for _ in range(calls):
+        try:
+            caller.call(rejected, op="get_user", idempotent=True)
+        except ValueError:
+            pass
+    print(f"{'':10} backend requests={len(requests)}  open={caller.is_open}")
+
+
+if __name__ == "__main__":
+    random.seed(1)
+    tail_latency()
+    hung_backend()
+    hard_down()
+    application_errors()
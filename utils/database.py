@@ -1,20 +1,46 @@
 import streamlit as st
-from supabase import create_client, Client
+from supabase import create_client, Client, ClientOptions
 from datetime import datetime
 import json
+import httpx
+from utils.resilience import ResilientCaller
+
+# Shared across Streamlit reruns and worker jobs so latency history and
+# breaker state survive each new Database instance
+_caller = ResilientCaller(transient=(TimeoutError, ConnectionError, httpx.TransportError))
 
 class Database:
-    def __init__(self):
+    def __init__(self, caller: ResilientCaller = None):
         self.url = st.secrets["supabase_url"]
         self.key = st.secrets["supabase_key"]
-        self.client: Client = create_client(self.url, self.key)
+        self.caller = caller or _caller
+        # HTTP timeouts match the call deadlines, so requests the caller
+        # has given up on free their pool worker instead of hanging on
+        self.client: Client = create_client(
+            self.url, self.key,
+            options=ClientOptions(postgrest_client_timeout=self.caller.timeout)
+        )
+        self.write_client: Client = create_client(
+            self.url, self.key,
+            options=ClientOptions(postgrest_client_timeout=self.caller.write_timeout)
+        )
     
-    def get_user(self, email: str):
-        """Get user by email"""
+    def get_user(self, email: str, allow_stale: bool = True, raise_errors: bool = False):
+        """
+        Get user by email, None if there is no such user
+        allow_stale=False never falls back to a cached copy
+        raise_errors=True re-raises a failed lookup instead of returning None
+        """
         try:
-            response = self.client.table("users").select("*").eq("email", email).execute()
+            response = self.caller.call(
+                lambda: self.client.table("users").select("*").eq("email", email).execute(),
+                op="get_user", idempotent=True, hedge=True,
+                cache_key=("user", email) if allow_stale else None
+            )
             return response.data[0] if response.data else None
         except Exception as e:
+            if raise_errors:
+                raise
             st.error(f"Database error: {e}")
             return None
     
@@ -27,27 +53,50 @@ class Database:
                 "tier": "free",
                 "created_at": datetime.utcnow().isoformat()
             }
-            response = self.client.table("users").insert(user_data).execute()
+            response = self.caller.call(
+                lambda: self.client.table("users").insert(user_data).execute(),
+                op="create_user"
+            )
             return response.data[0]
         except Exception as e:
             st.error(f"Error creating user: {e}")
             return None
     
-    def update_credits(self, email: str, credit_change: int):
-        """Add or subtract credits"""
+    def update_credits(self, email: str, credit_change: int, max_attempts: int = 3):
+        """
+        Add or subtract credits
+        The write only applies if the balance is still the one just read,
+        so a concurrent purchase or deduction is never overwritten.
+        Raises TimeoutError when the write may or may not have landed.
+        """
         try:
-            user = self.get_user(email)
-            new_credits = user["credits"] + credit_change
-            response = self.client.table("users").update(
-                {"credits": new_credits}
-            ).eq("email", email).execute()
-            return new_credits
+            for _ in range(max_attempts):
+                try:
+                    user = self.get_user(email, allow_stale=False, raise_errors=True)
+                except TimeoutError as e:
+                    # Nothing was written yet, so this is a plain failure
+                    raise RuntimeError(f"could not read balance: {e}") from e
+                if user is None:
+                    raise LookupError(f"user {email} not found")
+                old_credits = user["credits"]
+                new_credits = old_credits + credit_change
+                response = self.caller.call(
+                    lambda: self.write_client.table("users").update(
+                        {"credits": new_credits}
+                    ).eq("email", email).eq("credits", old_credits).execute(),
+                    op="update_credits", timeout=self.caller.write_timeout
+                )
+                if response.data:
+                    return new_credits
+            raise RuntimeError("balance kept changing, please try again")
+        except TimeoutError:
+            raise
         except Exception as e:
             st.error(f"Error updating credits: {e}")
             return None
     
     def create_job(self, user_email: str, job_type: str, parameters: dict):
-        """Create a new job record"""
+        """Create a new job record, raises TimeoutError when the insert may or may not have landed"""
         try:
             job_data = {
                 "user_email": user_email,
@@ -56,8 +105,13 @@ class Database:
                 "parameters": parameters,
                 "created_at": datetime.utcnow().isoformat()
             }
-            response = self.client.table("jobs").insert(job_data).execute()
+            response = self.caller.call(
+                lambda: self.write_client.table("jobs").insert(job_data).execute(),
+                op="create_job", timeout=self.caller.write_timeout
+            )
             return response.data[0]["id"]
+        except TimeoutError:
+            raise
         except Exception as e:
             st.error(f"Error creating job: {e}")
             return None
@@ -70,9 +124,13 @@ class Database:
                 update_data["results"] = results
                 update_data["completed_at"] = datetime.utcnow().isoformat()
             
-            response = self.client.table("jobs").update(
-                update_data
-            ).eq("id", job_id).execute()
+            # Setting the same fields twice is harmless, so this can retry
+            response = self.caller.call(
+                lambda: self.client.table("jobs").update(
+                    update_data
+                ).eq("id", job_id).execute(),
+                op="update_job", idempotent=True
+            )
             return True
         except Exception as e:
             print(f"Error updating job: {e}")
@@ -81,12 +139,35 @@ class Database:
     def get_user_jobs(self, user_email: str, limit: int = 10):
         """Get user's job history"""
         try:
-            response = self.client.table("jobs").select(
-                "*"
-            ).eq("user_email", user_email).order(
-                "created_at", desc=True
-            ).limit(limit).execute()
+            response = self.caller.call(
+                lambda: self.client.table("jobs").select(
+                    "*"
+                ).eq("user_email", user_email).order(
+                    "created_at", desc=True
+                ).limit(limit).execute(),
+                op="get_user_jobs", idempotent=True, hedge=True,
+                cache_key=("jobs", user_email, limit)
+            )
             return response.data
         except Exception as e:
             st.error(f"Error fetching jobs: {e}")
             return []
+    
+    def get_completed_jobs(self, limit: int = 500, raise_errors: bool = False):
+        """Get recent completed jobs across all users, newest first"""
+        try:
+            response = self.caller.call(
+                lambda: self.client.table("jobs").select(
+                    "results"
+                ).eq("status", "completed").order(
+                    "completed_at", desc=True
+                ).limit(limit).execute(),
+                op="get_completed_jobs", idempotent=True, hedge=True,
+                cache_key=("completed_jobs", limit)
+            )
+            return response.data
+        except Exception as e:
+            if raise_errors:
+                raise
+            print(f"Error fetching completed jobs: {e}")
+            return []
@@ -0,0 +1,161 @@
+import threading
+from bisect import bisect_left, bisect_right
+
+
+def dominates(a: dict, b: dict) -> bool:
+    """True if model a is at least as accurate, fast and small as model b"""
+    return (a["accuracy"] >= b["accuracy"]
+            and a["speed"] <= b["speed"]
+            and a["size"] <= b["size"])
+
+
+class ParetoFrontier:
+    """
+    Accuracy/speed/size Pareto frontier for one disease.
+
+    Each model name has one entry holding its latest measurement. Points
+    on the frontier are kept sorted by descending accuracy, so the best
+    model under a latency and size budget is the first frontier point
+    that fits.
+    """
+
+    def __init__(self):
+        self._models = {}   # name -> latest point, on the frontier or not
+        self._keys = []     # -accuracy, parallel to _points for bisect
+        self._points = []
+
+    def __len__(self):
+        return len(self._points)
+
+    @property
+    def points(self):
+        return [dict(p) for p in self._points]
+
+    def update(self, model: dict) -> bool:
+        """Record a model's latest measurement. Returns True if the frontier changed"""
+        point = {
+            "name": model["name"],
+            "accuracy": float(model["accuracy"]),
+            "speed": float(model["speed"]),
+            "size": float(model["size"]),
+        }
+        old = self._models.get(point["name"])
+        if old == point:
+            return False
+        self._models[point["name"]] = point
+
+        if old is None or not self._remove(old):
+            return self._insert(point)
+
+        # Models the old measurement was hiding may be back on the frontier
+        candidates = [m for m in self._models.values() if m is point or dominates(old, m)]
+        for candidate in candidates:
+            self._insert(candidate)
+        return True
+
+    def best(self, max_speed: float = None, max_size: float = None):
+        """Most accurate frontier model within the limits, or None"""
+        for point in self._points:
+            if max_speed is not None and point["speed"] > max_speed:
+                continue
+            if max_size is not None and point["size"] > max_size:
+                continue
+            return dict(point)
+        return None
+
+    def _insert(self, point: dict) -> bool:
+        # Only points at least as accurate can dominate the new one
+        stop = bisect_right(self._keys, -point["accuracy"])
+        for existing in self._points[:stop]:
+            if existing is point or dominates(existing, point):
+                return False
+
+        # ...and the new point can only dominate points no more accurate
+        start = bisect_left(self._keys, -point["accuracy"])
+        keep = [p for p in self._points[start:] if not dominates(point, p)]
+        self._points[start:] = keep
+        self._keys[start:] = [-p["accuracy"] for p in keep]
+
+        index = bisect_right(self._keys, -point["accuracy"])
+        self._keys.insert(index, -point["accuracy"])
+        self._points.insert(index, point)
+        return True
+
+    def _remove(self, point: dict) -> bool:
+        """Drop a point from the frontier, False if it was not on it"""
+        index = bisect_left(self._keys, -point["accuracy"])
+        stop = bisect_right(self._keys, -point["accuracy"])
+        for i in range(index, stop):
+            if self._points[i] is point:
+                del self._points[i]
+                del self._keys[i]
+                return True
+        return False
+
+
+class RecommendationEngine:
+    """
+    Answers "max X ms, max Y MB, maximize accuracy" queries per disease
+    from precomputed Pareto frontiers. New job results are folded in as
+    they arrive.
+    """
+
+    def __init__(self, catalog: dict = None):
+        self._lock = threading.Lock()
+        self._frontiers = {}
+        for disease, data in (catalog or {}).items():
+            self.add_models(disease, data["models"])
+
+    def add_models(self, disease: str, models: list) -> int:
+        """Record the latest measurement of each model, returns how many changed the frontier"""
+        with self._lock:
+            frontier = self._frontiers.setdefault(disease, ParetoFrontier())
+            return sum(frontier.update(model) for model in models)
+
+    def add_results(self, results: dict) -> int:
+        """Fold a completed benchmark result into its disease frontier"""
+        if not results or "models" not in results:
+            return 0
+        return self.add_models(results["disease"], results["models"])
+
+    def frontier(self, disease: str) -> list:
+        with self._lock:
+            frontier = self._frontiers.get(disease)
+            return frontier.points if frontier else []
+
+    def recommend(self, disease: str, max_speed: float = None, max_size: float = None):
+        """Most accurate model for the disease within the limits, or None"""
+        with self._lock:
+            frontier = self._frontiers.get(disease)
+            return frontier.best(max_speed, max_size) if frontier else None
+
+    def recommendation_text(self, disease: str, max_speed: float = None, max_size: float = None,
+                            current: list = None) -> str:
+        """
+        Human readable recommendation for the given limits
+        current: models from the run being shown, figures that do not match
+                 one of them are flagged as coming from earlier runs
+        """
+        limits = []
+        if max_speed is not None:
+            limits.append(f"{max_speed:g}ms")
+        if max_size is not None:
+            limits.append(f"{max_size:g}MB")
+        limits_str = " and ".join(limits) if limits else "no limits"
+
+        model = self.recommend(disease, max_speed, max_size)
+        disease_name = disease.replace("_", " ")
+        if model is None:
+            return (f"No benchmarked model for {disease_name} fits within {limits_str}. "
+                    f"Try relaxing your limits.")
+        text = (f"For {disease_name} within {limits_str}, {model['name']} gives the best accuracy "
+                f"({model['accuracy']:.0%}) at {model['speed']:g}ms and {model['size']:g}MB.")
+        if current is not None and not any(
+            m["name"] == model["name"]
+            and float(m["accuracy"]) == model["accuracy"]
+            and float(m["speed"]) == model["speed"]
+            and float(m["size"]) == model["size"]
+            for m in current
+        ):
+            text += " These figures come from an earlier benchmark run."
+        return text
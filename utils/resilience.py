@@ -0,0 +1,208 @@
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+
+class CircuitOpenError(Exception):
+    """Raised when the backend is failing fast and no cached value exists"""
+
+
+class ResilientCaller:
+    """
+    Wraps blocking backend calls with a deadline, hedged reads,
+    jittered retries and a circuit breaker.
+
+    Calls run on a small thread pool so a stalled request never blocks
+    the caller past its deadline. A request that misses its deadline is
+    abandoned, not cancelled: if it was already sent it may still land,
+    so writes that must not be lost or doubled should pass a longer
+    timeout and treat TimeoutError as "outcome unknown".
+
+    Only exceptions in `transient` (transport errors and timeouts) are
+    retried and counted against the breaker. Anything else means the
+    backend answered, e.g. a bad filter or a constraint violation, and
+    is re-raised straight away.
+    """
+
+    def __init__(self, timeout: float = 5.0, write_timeout: float = 30.0,
+                 hedge_percentile: float = 0.95, hedge_min_samples: int = 20,
+                 max_retries: int = 2, backoff_base: float = 0.1,
+                 backoff_cap: float = 1.0, failure_threshold: int = 5,
+                 reset_timeout: float = 30.0, max_workers: int = 8,
+                 latency_window: int = 200, cache_size: int = 1024,
+                 transient: tuple = (TimeoutError, ConnectionError)):
+        self.timeout = timeout
+        self.write_timeout = write_timeout
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.latency_window = latency_window
+        self.cache_size = cache_size
+        self.transient = transient
+
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="backend")
+        self._lock = threading.Lock()
+        self._latencies = {}    # op name -> recent latencies in seconds
+        self._cache = {}
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+
+    def call(self, fn, op: str = "default", idempotent: bool = False, hedge: bool = False,
+             cache_key=None, timeout: float = None):
+        """
+        Run fn() under the resilience policy.
+        op: operation name, each op keeps its own latency history
+        idempotent: retry with jittered backoff on transient failures
+        hedge: send a duplicate request once the primary is slower than
+               the op's recent latency percentile (reads only)
+        cache_key: remember the result and serve it while the circuit is open
+        timeout: overall deadline in seconds, defaults to self.timeout
+        """
+        admission = self._admit()
+        if admission is None:
+            return self._stale(cache_key)
+        trial = admission == "trial"
+
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        attempts = 1 if trial else 1 + (self.max_retries if idempotent else 0)
+        error = None
+        for attempt in range(attempts):
+            try:
+                result = self._attempt(fn, op, hedge, deadline)
+            except self.transient as e:
+                error = e
+                if attempt + 1 == attempts or self.is_open:
+                    break
+                # Full jitter keeps retries from many callers from lining up
+                backoff = random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+                if time.monotonic() + backoff >= deadline:
+                    break
+                time.sleep(backoff)
+            except Exception:
+                # The backend answered, it just rejected the request
+                self._record_success()
+                raise
+            else:
+                self._record_success()
+                self._remember(cache_key, result)
+                return result
+
+        # One failed call counts once, however many attempts it made
+        self._record_failure(trial)
+        if self.is_open:
+            try:
+                return self._stale(cache_key)
+            except CircuitOpenError:
+                pass
+        raise error
+
+    @property
+    def is_open(self) -> bool:
+        with self._lock:
+            return self._opened_at is not None
+
+    def hedge_delay(self, op: str = "default"):
+        """Latency percentile for op after which a read gets hedged, None until warmed up"""
+        with self._lock:
+            samples = sorted(self._latencies.get(op, ()))
+        if len(samples) < self.hedge_min_samples:
+            return None
+        index = min(len(samples) - 1, int(self.hedge_percentile * len(samples)))
+        return samples[index]
+
+    def _attempt(self, fn, op: str, hedge: bool, deadline: float):
+        start = time.monotonic()
+        futures = {self._pool.submit(self._timed, fn, op)}
+
+        delay = self.hedge_delay(op) if hedge else None
+        if delay is not None and time.monotonic() + delay < deadline:
+            done, _ = wait(futures, timeout=delay)
+            if not done:
+                futures.add(self._pool.submit(self._timed, fn, op))
+
+        pending = futures
+        error = None
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    return future.result()
+                except Exception as e:
+                    error = e
+
+        for future in pending:
+            future.cancel()
+        if pending or error is None:
+            # A timed out attempt still tells us how slow the op is
+            self._record_latency(op, time.monotonic() - start)
+            raise TimeoutError(f"Backend call exceeded its deadline ({op})")
+        raise error
+
+    def _timed(self, fn, op: str):
+        start = time.monotonic()
+        result = fn()
+        self._record_latency(op, time.monotonic() - start)
+        return result
+
+    def _record_latency(self, op: str, seconds: float):
+        with self._lock:
+            window = self._latencies.get(op)
+            if window is None:
+                window = self._latencies[op] = deque(maxlen=self.latency_window)
+            window.append(seconds)
+
+    def _admit(self):
+        """Returns "closed" for a normal call, "trial" for the half-open probe, None to fail fast"""
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if self._trial_running:
+                return None
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._trial_running = True
+                return "trial"
+            return None
+
+    def _record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def _record_failure(self, trial: bool):
+        with self._lock:
+            if trial:
+                self._opened_at = time.monotonic()
+                self._trial_running = False
+            elif self._opened_at is None:
+                self._failures += 1
+                if self._failures >= self.failure_threshold:
+                    self._opened_at = time.monotonic()
+            # Late failures from calls admitted before the breaker opened
+            # must not push the reset window further out
+
+    def _remember(self, cache_key, result):
+        if cache_key is None:
+            return
+        with self._lock:
+            self._cache.pop(cache_key, None)
+            if len(self._cache) >= self.cache_size:
+                self._cache.pop(next(iter(self._cache)))
+            self._cache[cache_key] = result
+
+    def _stale(self, cache_key):
+        with self._lock:
+            if cache_key is not None and cache_key in self._cache:
+                return self._cache[cache_key]
+        raise CircuitOpenError("Backend unavailable, try again shortly")